@@ -0,0 +1,73 @@
+"""
+AST node types for MiniLang.
+Each node is a namedtuple whose first field is its string tag, so nodes still
+index and compare like the plain tuples used elsewhere (e.g. ('add', l, r)),
+while AST visitors can dispatch on type(node) instead of comparing tags.
+Tags are interned and supplied by the constructor, so every node carries the
+same tag object, including nodes rebuilt by pickle. Hand-built ASTs made of
+plain tagged tuples can be converted with as_node().
+"""
+
+import sys
+from collections import namedtuple
+
+_NODE_TYPES = {}  # tag -> node class
+
+def _node(name, tag, fields):
+    """Create a node class with a fixed tag followed by the given fields."""
+    base = namedtuple(name, ('tag',) + fields)
+    tag = sys.intern(tag)
+
+    def __new__(cls, *args):
+        return base.__new__(cls, tag, *args)
+
+    def __getnewargs__(self):
+        # The tag is supplied by __new__, so pickle/copy must not pass it again
+        return tuple(self)[1:]
+
+    def __repr__(self):
+        args = ', '.join(f"{f}={v!r}" for f, v in zip(fields, self[1:]))
+        return f"{name}({args})"
+
+    cls = _NODE_TYPES[tag] = type(name, (base,), {
+        '__slots__': (),
+        '__module__': __name__,
+        '__new__': __new__,
+        '__getnewargs__': __getnewargs__,
+        '__repr__': __repr__,
+    })
+    return cls
+
+# Statements
+Assign = _node('Assign', 'assign', ('name', 'expr'))
+If = _node('If', 'if', ('cond', 'then', 'else_'))
+Assert = _node('Assert', 'assert', ('cond',))
+For = _node('For', 'for', ('init', 'cond', 'update', 'body'))
+While = _node('While', 'while', ('cond', 'body'))
+
+# Expressions
+Var = _node('Var', 'var', ('name',))
+Cond = _node('Cond', 'cond', ('op', 'left', 'right'))
+Add = _node('Add', 'add', ('left', 'right'))
+Sub = _node('Sub', 'sub', ('left', 'right'))
+Mul = _node('Mul', 'mul', ('left', 'right'))
+Div = _node('Div', 'div', ('left', 'right'))
+
+BINOPS = (Add, Sub, Mul, Div)
+
+def as_node(obj):
+    """Convert plain tagged tuples, e.g. ('add', l, r), to AST nodes, recursively.
+
+    Nodes and other values are returned unchanged; lists and untagged tuples
+    (statement blocks) become tuples of converted items.
+    """
+    kind = type(obj)
+    if kind is tuple:
+        if obj and type(obj[0]) is str:
+            cls = _NODE_TYPES.get(obj[0])
+            if cls is not None:
+                return cls(*map(as_node, obj[1:]))
+        return tuple(map(as_node, obj))
+    if kind is list:
+        return tuple(map(as_node, obj))
+    return obj
@@ -1,15 +1,75 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, simpledialog
-from parser import parse_and_transform, SSAConverter, format_ssa_output, parser, EXAMPLE_PROGRAM, EXAMPLE_PROGRAM_2, check_program_equivalence
-from smt_generator import SMTGenerator
+from parser import parse_and_transform, parse_tree_text, ssa_of, format_ssa_output, EXAMPLE_PROGRAM, EXAMPLE_PROGRAM_2
 from loop_unroller import unroll_loops, format_unrolled_code
 
+def _render_ast(code):
+    return str(parse_and_transform(code))
+
+def _render_ssa(code):
+    return format_ssa_output(ssa_of(parse_and_transform(code)))
+
+# Long-lived solver for the SMT tab. Each check runs in its own push/pop
+# scope, so Z3 keeps its internal state between analyze clicks.
+_smt_solver = None
+
+def _render_smt(code):
+    # Z3 is imported on first use so it does not slow down GUI startup
+    from smt_generator import Z3_LOCK
+
+    ssa = ssa_of(parse_and_transform(code))
+    # shared with the equivalence check, which runs on its own worker thread
+    with Z3_LOCK:
+        return _check_smt_locked(ssa)
+
+def _check_smt_locked(ssa):
+    from smt_generator import SMTGenerator, make_solver
+
+    global _smt_solver
+    if _smt_solver is None:
+        _smt_solver = make_solver()
+    _smt_solver.push()
+    try:
+        smt = SMTGenerator(ssa, solver=_smt_solver)
+        smt.to_smt()
+        return smt.check_assertions()
+    finally:
+        _smt_solver.pop()
+
+def _render_equivalence(prog1, prog2):
+    from smt_generator import check_program_equivalence
+
+    ssa1 = ssa_of(parse_and_transform(prog1))
+    ssa2 = ssa_of(parse_and_transform(prog2))
+    return check_program_equivalence(ssa1, ssa2)
+
+# Analysis stages: name -> (render function, error label). Each stage only
+# depends on the memoized parse/SSA helpers, so it can be computed on its own.
+_STAGES = {
+    'parse_tree': (parse_tree_text, "Parse Error"),
+    'ast': (_render_ast, "AST Error"),
+    'ssa': (_render_ssa, "SSA Error"),
+    'smt': (_render_smt, "SMT Error"),
+}
+
 class MiniLangGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("MiniLang Analyzer")
         self.root.geometry("1100x700")
 
+        # Analysis stages run on worker threads, only when their tab is shown.
+        # Results are posted to the queue and applied from the Tk main loop.
+        self._result_q = queue.Queue()
+        self._analysis_gen = 0
+        self._current_code = None
+        # the equivalence tab posts to the same queue under its own generation
+        self._equiv_gen = 0
+        self._results = {}
+        self._pending = set()
+
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill='both', expand=True)
 
@@ -25,6 +85,8 @@ class MiniLangGUI:
 
         self.setup_equiv_tab()
 
+        self.root.after(50, self._drain_results)
+
     def setup_analysis_tab(self):
         frame = self.tab_analysis
 
@@ -52,6 +114,20 @@ class MiniLangGUI:
         self.tab_smt, self.text_smt = self._add_output_tab(self.analysis_tabs, "SMT Verification")
         self.tab_unroll, self.text_unroll = self._add_output_tab(self.analysis_tabs, "Unrolled Code")
 
+        self._stage_widgets = {
+            'parse_tree': self.text_parse_tree,
+            'ast': self.text_ast,
+            'ssa': self.text_ssa,
+            'smt': self.text_smt,
+        }
+        self._tab_stages = {
+            str(self.tab_parse_tree): 'parse_tree',
+            str(self.tab_ast): 'ast',
+            str(self.tab_ssa): 'ssa',
+            str(self.tab_smt): 'smt',
+        }
+        self.analysis_tabs.bind('<<NotebookTabChanged>>', self._on_tab_change)
+
     def setup_equiv_tab(self):
         frame = self.tab_equiv
 
@@ -94,39 +170,50 @@ class MiniLangGUI:
             messagebox.showwarning("Input Required", "Please enter a program.")
             return
 
-        # Parse Tree
-        try:
-            tree = parser.parse(code)
-            parse_tree_str = tree.pretty()
-        except Exception as e:
-            parse_tree_str = f"Parse Error:\n{e}"
+        self._analysis_gen += 1
+        self._current_code = code
+        self._results = {}
+        self._pending = set()
+        for widget in self._stage_widgets.values():
+            self._set_output(widget, "")
+        self._on_tab_change()
 
-        # AST
-        try:
-            ast = parse_and_transform(code)
-            ast_str = str(ast)
-        except Exception as e:
-            ast_str = f"AST Error:\n{e}"
+    def _on_tab_change(self, event=None):
+        """Compute the selected tab's stage if it has not been computed for the current input."""
+        stage = self._tab_stages.get(self.analysis_tabs.select())
+        if stage is not None:
+            self._compute_stage(stage)
 
-        # SSA
-        try:
-            ssa = SSAConverter().convert(ast)
-            ssa_str = format_ssa_output(ssa)
-        except Exception as e:
-            ssa_str = f"SSA Error:\n{e}"
+    def _compute_stage(self, stage):
+        if self._current_code is None or stage in self._results or stage in self._pending:
+            return
+        self._pending.add(stage)
+        threading.Thread(target=self._run_stage, args=(self._analysis_gen, self._current_code, stage), daemon=True).start()
 
-        # SMT
+    def _run_stage(self, gen, code, stage):
+        """Render one analysis stage off the main thread and post the result."""
+        render, error_label = _STAGES[stage]
         try:
-            smt = SMTGenerator(ssa)
-            smt.to_smt()
-            smt_str = smt.check_assertions()
+            text = render(code)
         except Exception as e:
-            smt_str = f"SMT Error:\n{e}"
+            text = f"{error_label}:\n{e}"
+        self._result_q.put((gen, stage, text))
 
-        self._set_output(self.text_parse_tree, parse_tree_str)
-        self._set_output(self.text_ast, ast_str)
-        self._set_output(self.text_ssa, ssa_str)
-        self._set_output(self.text_smt, smt_str)
+    def _drain_results(self):
+        """Apply queued analysis results, ignoring those from superseded runs."""
+        try:
+            while True:
+                gen, stage, text = self._result_q.get_nowait()
+                if stage == 'equiv':
+                    if gen == self._equiv_gen:
+                        self._set_output(self.equiv_output, text)
+                elif gen == self._analysis_gen:
+                    self._results[stage] = text
+                    self._pending.discard(stage)
+                    self._set_output(self._stage_widgets[stage], text)
+        except queue.Empty:
+            pass
+        self.root.after(50, self._drain_results)
 
     def check_equivalence(self):
         prog1 = self.input_prog1.get('1.0', tk.END).strip()
@@ -134,15 +221,17 @@ class MiniLangGUI:
         if not prog1 or not prog2:
             messagebox.showwarning("Input Required", "Please enter both programs.")
             return
+        self._equiv_gen += 1
+        self._set_output(self.equiv_output, "Checking equivalence...")
+        threading.Thread(target=self._run_equivalence, args=(self._equiv_gen, prog1, prog2), daemon=True).start()
+
+    def _run_equivalence(self, gen, prog1, prog2):
+        """Check equivalence off the main thread, which may wait on Z3_LOCK."""
         try:
-            ast1 = parse_and_transform(prog1)
-            ssa1 = SSAConverter().convert(ast1)
-            ast2 = parse_and_transform(prog2)
-            ssa2 = SSAConverter().convert(ast2)
-            result = check_program_equivalence(ssa1, ssa2)
+            text = _render_equivalence(prog1, prog2)
         except Exception as e:
-            result = f"Equivalence Error:\n{e}"
-        self._set_output(self.equiv_output, result)
+            text = f"Equivalence Error:\n{e}"
+        self._result_q.put((gen, 'equiv', text))
 
     def unroll_loops_gui(self):
         code = self.input_text.get('1.0', tk.END).strip()
@@ -164,8 +253,7 @@ class MiniLangGUI:
 
     def _set_output(self, widget, text):
         widget.config(state='normal')
-        widget.delete('1.0', tk.END)
-        widget.insert('1.0', text)
+        widget.replace('1.0', tk.END, text)
         widget.config(state='disabled')
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Lark transformer that turns MiniLang parse trees into AST nodes.
+Kept apart from parser.py so Lark is only imported when a Lark parser is built.
+"""
+
+from lark import Transformer
+from ast_nodes import Assign, If, Assert, Cond, Var, Add, Sub, Mul, Div
+
+class MiniLangTransformer(Transformer):
+    def start(self, items):
+        # Tuples keep the AST hashable so parse results can be memoized
+        return tuple(items)
+        
+    def assignment(self, items):
+        var_name, expr = items
+        return Assign(str(var_name), expr)
+        
+    def if_statement(self, items):
+        cond = items[0]
+        block = tuple(items[1:])
+        return If(cond, block, None)
+        
+    def assert_stmt(self, items):
+        return Assert(items[0])
+        
+    def condition(self, items):
+        left, op, right = items
+        return Cond(op, left, right)
+        
+    def add(self, items):
+        left, right = items
+        return Add(left, right)
+        
+    def sub(self, items):
+        left, right = items
+        return Sub(left, right)
+        
+    def mul(self, items):
+        left, right = items
+        return Mul(left, right)
+        
+    def div(self, items):
+        left, right = items
+        return Div(left, right)
+        
+    def number(self, items):
+        return int(str(items[0]))
+        
+    def var(self, items):
+        return Var(str(items[0]))
@@ -0,0 +1,164 @@
+"""
+Hand-written recursive-descent parser for MiniLang.
+Accepts the same language as the Lark grammar in parser.py and builds the same
+AST nodes as lark_transformer.MiniLangTransformer, in a single linear pass over
+the tokens.
+"""
+
+import re
+
+from ast_nodes import Assign, If, Assert, Cond, Var, Add, Sub, Mul, Div
+
+_TOKEN_RE = re.compile(r"""
+    (?P<NUM>[0-9]+)
+  | (?P<ID>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<OP>:=|<=|>=|==|!=|[-+*/<>(){};])
+  | (?P<WS>[ \t\f\r\n]+)
+  | (?P<ERR>.)
+""", re.VERBOSE | re.DOTALL)
+
+COMPARATORS = frozenset(('<', '>', '<=', '>=', '==', '!='))
+_ADD_OPS = {'+': Add, '-': Sub}
+_MUL_OPS = {'*': Mul, '/': Div}
+
+class ParseError(Exception):
+    """Raised when program text is not valid MiniLang."""
+
+def _location(text, pos):
+    line = text.count('\n', 0, pos) + 1
+    column = pos - (text.rfind('\n', 0, pos) + 1) + 1
+    return f"line {line}, column {column}"
+
+def tokenize(text):
+    """Split program text into (kind, value, position) tokens, ending with EOF."""
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == 'WS':
+            continue
+        if kind == 'ERR':
+            raise ParseError(f"Unexpected character {m.group()!r} at {_location(text, m.start())}.")
+        tokens.append((kind, m.group(), m.start()))
+    tokens.append(('EOF', '', len(text)))
+    return tokens
+
+class Parser:
+    """Parses one program; use Parser(text).parse_program()."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def advance(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def error(self, tok, expected):
+        kind, value, start = tok
+        found = "end of input" if kind == 'EOF' else f"token {value!r}"
+        return ParseError(f"Unexpected {found} at {_location(self.text, start)}. Expected {expected}.")
+
+    def expect(self, value):
+        tok = self.advance()
+        if tok[1] != value:
+            raise self.error(tok, repr(value))
+        return tok
+
+    def parse_program(self):
+        """program: statement+"""
+        stmts = [self.parse_stmt()]
+        while self.peek()[0] != 'EOF':
+            stmts.append(self.parse_stmt())
+        return tuple(stmts)
+
+    def parse_stmt(self):
+        kind, value, _ = tok = self.peek()
+        if kind == 'ID':
+            if value == 'if':
+                return self.parse_if()
+            if value == 'assert':
+                return self.parse_assert()
+            return self.parse_assignment()
+        raise self.error(tok, "a statement")
+
+    def parse_assignment(self):
+        """assignment: NAME ":=" expr ";" """
+        name = self.advance()[1]
+        self.expect(':=')
+        expr = self.parse_expr()
+        self.expect(';')
+        return Assign(name, expr)
+
+    def parse_if(self):
+        """if_statement: "if" "(" condition ")" "{" statement+ "}" """
+        self.advance()
+        self.expect('(')
+        cond = self.parse_condition()
+        self.expect(')')
+        self.expect('{')
+        block = [self.parse_stmt()]
+        while self.peek()[1] != '}':
+            block.append(self.parse_stmt())
+        self.advance()
+        return If(cond, tuple(block), None)
+
+    def parse_assert(self):
+        """assert_stmt: "assert" "(" condition ")" ";" """
+        self.advance()
+        self.expect('(')
+        cond = self.parse_condition()
+        self.expect(')')
+        self.expect(';')
+        return Assert(cond)
+
+    def parse_condition(self):
+        """condition: expr COMP expr"""
+        left = self.parse_expr()
+        tok = self.advance()
+        if tok[0] != 'OP' or tok[1] not in COMPARATORS:
+            raise self.error(tok, "a comparison operator")
+        right = self.parse_expr()
+        return Cond(tok[1], left, right)
+
+    def parse_expr(self):
+        """expr: term (("+" | "-") term)*, left-associative"""
+        left = self.parse_term()
+        while self.peek()[1] in _ADD_OPS:
+            node = _ADD_OPS[self.advance()[1]]
+            left = node(left, self.parse_term())
+        return left
+
+    def parse_term(self):
+        """term: factor (("*" | "/") factor)*, left-associative"""
+        left = self.parse_factor()
+        while self.peek()[1] in _MUL_OPS:
+            node = _MUL_OPS[self.advance()[1]]
+            left = node(left, self.parse_factor())
+        return left
+
+    def parse_factor(self):
+        """factor: NUMBER | NAME | "(" expr ")" """
+        kind, value, start = tok = self.advance()
+        if kind == 'NUM':
+            return int(value)
+        if kind == 'ID':
+            # keywords are only reserved at the start of a statement, as in the
+            # Lark grammar, so `x := if;` reads a variable named "if"
+            return Var(value)
+        if kind == 'OP':
+            if value == '(':
+                expr = self.parse_expr()
+                self.expect(')')
+                return expr
+            # Negative literals are a single token in the grammar (NUMBER: /-?[0-9]+/),
+            # so the '-' must be directly followed by the digits.
+            nxt = self.peek()
+            if value == '-' and nxt[0] == 'NUM' and nxt[2] == start + 1:
+                self.advance()
+                return -int(nxt[1])
+        raise self.error(tok, "a number, variable or '('")
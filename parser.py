@@ -1,6 +1,8 @@
-from lark import Lark, Transformer
+import os
+import threading
+from functools import lru_cache
+from minilang_parser import Parser
 from ssa_converter import SSAConverter, format_ssa_output
-from smt_generator import SMTGenerator, check_program_equivalence
 
 # Grammar definition
 grammar = """
@@ -36,59 +38,90 @@ grammar = """
     %ignore WS
 """
 
-# Create parser
-parser = Lark(grammar)
-
-class MiniLangTransformer(Transformer):
-    def start(self, items):
-        return items
-        
-    def assignment(self, items):
-        var_name, expr = items
-        return ('assign', str(var_name), expr)
-        
-    def if_statement(self, items):
-        cond = items[0]
-        block = items[1:]
-        return ('if', cond, block, None)
-        
-    def assert_stmt(self, items):
-        return ('assert', items[0])
-        
-    def condition(self, items):
-        left, op, right = items
-        return ('cond', op, left, right)
-        
-    def add(self, items):
-        left, right = items
-        return ('add', left, right)
-        
-    def sub(self, items):
-        left, right = items
-        return ('sub', left, right)
-        
-    def mul(self, items):
-        left, right = items
-        return ('mul', left, right)
-        
-    def div(self, items):
-        left, right = items
-        return ('div', left, right)
-        
-    def number(self, items):
-        return int(str(items[0]))
-        
-    def var(self, items):
-        return ('var', str(items[0]))
 
+# Parsers are built lazily on first use; LALR tables are cached on disk so
+# later runs skip grammar analysis entirely. Lark itself is only imported
+# then, since the hand-written parser builds ASTs by default.
+_parser = None
+_tree_parser = None
+# Both parsers share the cache file, so one lock covers building either
+_PARSER_LOCK = threading.Lock()
+
+# Next to this file rather than in the working directory: Lark unpickles the
+# cache, so it must only ever load the one this checkout wrote (and .gitignores).
+_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.minilang_lalr.cache')
+
+def _build_parser(**options):
+    from lark import Lark
+    return Lark(grammar, start='start', parser='lalr', lexer='contextual',
+                cache=_CACHE_PATH,
+                propagate_positions=False, maybe_placeholders=False, **options)
+
+def get_parser():
+    """Return the shared AST parser, building it on first call.
+
+    The transformer runs during LALR reductions, so parse() returns the AST
+    directly without materializing an intermediate parse tree.
+    """
+    global _parser
+    if _parser is None:
+        with _PARSER_LOCK:
+            if _parser is None:
+                from lark_transformer import MiniLangTransformer
+                _parser = _build_parser(transformer=MiniLangTransformer())
+    return _parser
+
+def get_tree_parser():
+    """Return the shared parser that yields raw Lark parse trees."""
+    global _tree_parser
+    if _tree_parser is None:
+        with _PARSER_LOCK:
+            if _tree_parser is None:
+                _tree_parser = _build_parser()
+    return _tree_parser
+
+def __getattr__(name):
+    # parser.MiniLangTransformer still works, without importing Lark up front
+    if name == 'MiniLangTransformer':
+        from lark_transformer import MiniLangTransformer
+        return MiniLangTransformer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ASTs come from the hand-written parser; set MINILANG_USE_LARK=1 to build
+# them with Lark instead. The Parse Tree view always uses Lark.
+_USE_LARK = os.environ.get('MINILANG_USE_LARK') == '1'
+
+@lru_cache(maxsize=64)
 def parse_and_transform(program_text):
     """Parse program text and transform it to AST."""
-    tree = parser.parse(program_text)
-    transformer = MiniLangTransformer()
-    ast = transformer.transform(tree)
-    return ast
+    if _USE_LARK:
+        return get_parser().parse(program_text)
+    return Parser(program_text).parse_program()
+
+@lru_cache(maxsize=64)
+def parse_tree_text(program_text):
+    """Return the pretty-printed Lark parse tree for program text."""
+    return get_tree_parser().parse(program_text).pretty()
+
+# One converter is reused for every program; the lock keeps it safe to
+# call from the GUI's worker threads.
+_SSA = SSAConverter()
+_SSA_LOCK = threading.Lock()
+
+@lru_cache(maxsize=64)
+def _ssa_cached(ast):
+    with _SSA_LOCK:
+        _SSA.reset()
+        return tuple(_SSA.convert(ast))
+
+def ssa_of(ast):
+    """Convert an AST to SSA form, reusing results for previously seen ASTs."""
+    return list(_ssa_cached(ast))
 
 def main():
+    # Imported here so importing this module (e.g. from the GUI) does not load Z3
+    from smt_generator import SMTGenerator, check_program_equivalence
+
     print("\nProgram Analysis Options:")
     print("----------------------------------------")
     print("1. Input Program")
@@ -114,8 +147,7 @@ def main():
             if '2' in choice:
                 print("\nParse Tree:")
                 print("----------------------------------------")
-                tree = parser.parse(EXAMPLE_PROGRAM)
-                print(tree.pretty())
+                print(parse_tree_text(EXAMPLE_PROGRAM))
             
             if '3' in choice:
                 print("\nAbstract Syntax Tree (AST):")
@@ -127,14 +159,14 @@ def main():
                 print("\nStatic Single Assignment (SSA) Form:")
                 print("----------------------------------------")
                 ast = parse_and_transform(EXAMPLE_PROGRAM)
-                ssa = SSAConverter().convert(ast)
+                ssa = ssa_of(ast)
                 print(format_ssa_output(ssa))
             
             if '5' in choice:
                 print("\nProgram Verification (SMT):")
                 print("----------------------------------------")
                 ast = parse_and_transform(EXAMPLE_PROGRAM)
-                ssa = SSAConverter().convert(ast)
+                ssa = ssa_of(ast)
                 smt = SMTGenerator(ssa)
                 smt.to_smt()
                 print(smt.check_assertions())
@@ -144,13 +176,13 @@ def main():
                 print("----------------------------------------")
                 # Parse and convert first program
                 ast1 = parse_and_transform(EXAMPLE_PROGRAM)
-                ssa1 = SSAConverter().convert(ast1)
+                ssa1 = ssa_of(ast1)
                 
                 # Parse and convert second program
                 print("\nSecond Program:")
                 print(EXAMPLE_PROGRAM_2)
                 ast2 = parse_and_transform(EXAMPLE_PROGRAM_2)
-                ssa2 = SSAConverter().convert(ast2)
+                ssa2 = ssa_of(ast2)
                 
                 print("\nProgram 1 SSA:")
                 print(format_ssa_output(ssa1))
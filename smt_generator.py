@@ -1,103 +1,185 @@
 """SMT Generator for converting SSA form to Z3 constraints."""
+import ast
+import operator
+import re
+import threading
+from functools import lru_cache
 from z3 import *
 
+# Operator tables for expr_to_z3; Z3 terms overload the Python operators
+_BINOPS = {'add': operator.add, 'sub': operator.sub, 'mul': operator.mul, 'div': operator.truediv}
+_CMPS = {
+    '<': operator.lt, '>': operator.gt, '<=': operator.le,
+    '>=': operator.ge, '==': operator.eq, '!=': operator.ne,
+}
+
+def _int_div(a, b):
+    """Integer division with Z3/SMT-LIB semantics: the remainder is never negative."""
+    return a // b if b > 0 else -(a // -b)
+
+# Constant folding for arithmetic whose operands are both Python ints
+_INT_BINOPS = {'add': operator.add, 'sub': operator.sub, 'mul': operator.mul, 'div': _int_div}
+
+# parse_ssa: a binary operator must follow an operand character (spaces aside),
+# so unary minus and a minus after a comma inside a tuple literal never split
+_BINOP_RE = re.compile(r'(?<=[^\s+\-*(,])\s*([+\-*])\s*')
+_OP_TAGS = {'+': 'add', '-': 'sub', '*': 'mul'}
+
+# Every term and solver lives in this one context instead of Z3's implicit
+# global one, so Python constants must be lifted with an explicit ctx as well.
+# Sharing a context does not make Z3 thread-safe: callers must serialize all
+# use of it through Z3_LOCK below.
+_CTX = Context()
+
+# Z3 contexts are not thread-safe. Every entry point that builds terms or runs
+# a solver holds this lock; code that drives SMTGenerator directly from more
+# than one thread must hold it too. Freeing a Z3 object also touches the
+# context, so the work happens in helper functions whose locals die before
+# the lock is released.
+Z3_LOCK = threading.RLock()
+
+def make_solver():
+    """Create a solver in the shared Z3 context; use it only while holding Z3_LOCK."""
+    return SimpleSolver(ctx=_CTX)
+
+# Bounded, so a long GUI session does not keep every Z3 constant it has seen alive
+@lru_cache(maxsize=1024)
+def _int_var(name):
+    """Return the Z3 Int constant for name, shared by all generators (call under Z3_LOCK)."""
+    return Int(name, ctx=_CTX)
+
+def _subterms(expr):
+    """Sub-expressions of a tuple node; variables and unknown tags have none."""
+    tag = expr[0]
+    if tag in _BINOPS:
+        return expr[1:3]
+    if tag == 'cond':
+        return expr[2:4]
+    return ()
+
 class SMTGenerator:
-    def __init__(self, ssa_code, var_prefix=""):
+    def __init__(self, ssa_code, var_prefix="", solver=None):
         self.ssa_code = ssa_code if isinstance(ssa_code, list) else [ssa_code]
-        self.solver = Solver()
+        # an externally owned solver lets callers reuse it across programs
+        self.solver = solver if solver is not None else make_solver()
         self.vars = {}
-        self.path_condition = True
+        self._var_keys = {}  # name -> (base, version) sort key, computed once
+        self.path_condition = True  # constraints are only wrapped in Implies once this changes
         self.constraints = []
         self.var_prefix = var_prefix
+        self._z3_cache = {}  # id(node) -> (node, Z3 term), see expr_to_z3
+        self.final_versions = {}  # base name -> last SSA version, filled in by to_smt
 
     def get_var(self, name):
         """Get or create a Z3 variable."""
         if name not in self.vars:
             # prefix to avoid name collisions across programs
-            self.vars[name] = Int(f"{self.var_prefix}{name}")
+            self.vars[name] = _int_var(f"{self.var_prefix}{name}")
+            parts = name.split('_')
+            self._var_keys[name] = (parts[0], int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0)
         return self.vars[name]
 
     def expr_to_z3(self, expr):
         """Convert expression to Z3 formula."""
-        if isinstance(expr, (int, float)):
-            return expr
-        elif isinstance(expr, str):
+        if not isinstance(expr, tuple):
+            return self._leaf_to_z3(expr)
+        # Post-order with an explicit stack, so deeply nested expressions (e.g. long
+        # left-nested sums) cannot hit the recursion limit. Nodes are cached by
+        # identity, which avoids rehashing whole subtrees; each entry keeps its
+        # node alive so the id stays unique.
+        cache = self._z3_cache
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if id(node) in cache:
+                stack.pop()
+                continue
+            pending = [child for child in _subterms(node)
+                       if isinstance(child, tuple) and id(child) not in cache]
+            if pending:
+                stack.extend(pending)
+            else:
+                stack.pop()
+                cache[id(node)] = (node, self._node_to_z3(node))
+        return cache[id(expr)][1]
+
+    def _leaf_to_z3(self, expr):
+        if isinstance(expr, str):
             return self.get_var(expr)
-        elif isinstance(expr, tuple):
-            if expr[0] == 'var':
-                return self.get_var(expr[1])
-            elif expr[0] == 'cond':
-                _, op, left, right = expr
-                left_z3 = self.expr_to_z3(left)
-                right_z3 = self.expr_to_z3(right)
-                if op == '<':
-                    return left_z3 < right_z3
-                elif op == '>':
-                    return left_z3 > right_z3
-                elif op == '<=':
-                    return left_z3 <= right_z3
-                elif op == '>=':
-                    return left_z3 >= right_z3
-                elif op == '==':
-                    return left_z3 == right_z3
-                elif op == '!=':
-                    return left_z3 != right_z3
-            elif expr[0] == 'add':
-                left_z3 = self.expr_to_z3(expr[1])
-                right_z3 = self.expr_to_z3(expr[2])
-                return left_z3 + right_z3
-            elif expr[0] == 'sub':
-                left_z3 = self.expr_to_z3(expr[1])
-                right_z3 = self.expr_to_z3(expr[2])
-                return left_z3 - right_z3
-            elif expr[0] == 'mul':
-                left_z3 = self.expr_to_z3(expr[1])
-                right_z3 = self.expr_to_z3(expr[2])
-                return left_z3 * right_z3
-            elif expr[0] == 'div':
-                left_z3 = self.expr_to_z3(expr[1])
-                right_z3 = self.expr_to_z3(expr[2])
-                return left_z3 / right_z3
+        return expr  # numbers are used as-is
+
+    def _operand(self, expr):
+        """Z3 value of a sub-expression whose tuple nodes are already converted."""
+        if isinstance(expr, tuple):
+            return self._z3_cache[id(expr)][1]
+        return self._leaf_to_z3(expr)
+
+    def _node_to_z3(self, expr):
+        """Convert one tuple node whose sub-expressions are already converted."""
+        tag = expr[0]
+        arith = _BINOPS.get(tag)
+        if arith is not None:
+            left_z3 = self._operand(expr[1])
+            right_z3 = self._operand(expr[2])
+            if type(left_z3) is int and type(right_z3) is int:
+                if right_z3 or tag != 'div':
+                    return _INT_BINOPS[tag](left_z3, right_z3)
+                left_z3 = IntVal(left_z3, ctx=_CTX)  # division by zero is left to Z3
+            return arith(left_z3, right_z3)
+        elif tag == 'var':
+            return self.get_var(expr[1])
+        elif tag == 'cond':
+            _, op, left, right = expr
+            left_z3 = self._operand(left)
+            right_z3 = self._operand(right)
+            compare = _CMPS.get(op)
+            if compare is not None:
+                result = compare(left_z3, right_z3)
+                # comparing two folded constants gives a Python bool
+                return BoolVal(result, ctx=_CTX) if type(result) is bool else result
         return expr
 
     def to_smt(self):
         """Convert SSA code to SMT constraints."""
+        first_new = len(self.constraints)
         for stmt in self.ssa_code:
             if isinstance(stmt, tuple):
                 if stmt[0] == 'if':
                     cond = stmt[1]
-                    self.solver.add(Implies(self.path_condition, self.expr_to_z3(cond)))
-                    self.constraints.append(Implies(self.path_condition, self.expr_to_z3(cond)))
+                    f = self.expr_to_z3(cond)
+                    if self.path_condition is not True:
+                        f = Implies(self.path_condition, f)
+                    self.constraints.append(f)
                 elif stmt[0] == 'assert':
                     cond = stmt[1]
-                    self.solver.add(Implies(self.path_condition, self.expr_to_z3(cond)))
-                    self.constraints.append(Implies(self.path_condition, self.expr_to_z3(cond)))
-                else:  # Assignment
-                    var, op, rhs = stmt
-                    if isinstance(rhs, str) and rhs.startswith('phi'):
-                        # Handle phi nodes
-                        args = rhs[4:-1].split(',')
-                        args = [arg.strip() for arg in args]
+                    f = self.expr_to_z3(cond)
+                    if self.path_condition is not True:
+                        f = Implies(self.path_condition, f)
+                    self.constraints.append(f)
+                else:  # Assignment: (var, '=', rhs), or ('assign', var, rhs) from parse_ssa
+                    if stmt[0] == 'assign':
+                        _, var, rhs = stmt
+                    else:
+                        var, op, rhs = stmt
+                    self.final_versions[var.rsplit('_', 1)[0]] = var
+                    if isinstance(rhs, tuple) and rhs[0] == 'phi':
+                        # Handle phi nodes: ('phi', arg1, arg2, ...)
                         # For now, just use the first non-None argument
-                        for arg in args:
-                            if arg != 'None':
-                                self.solver.add(self.get_var(var) == self.get_var(arg))
-                                self.constraints.append(self.get_var(var) == self.get_var(arg))
+                        for arg in rhs[1:]:
+                            if arg is not None:
+                                f = self.get_var(var) == self.expr_to_z3(arg)
+                                self.constraints.append(f)
                                 break
                     else:
-                        self.solver.add(self.get_var(var) == self.expr_to_z3(rhs))
-                        self.constraints.append(self.get_var(var) == self.expr_to_z3(rhs))
+                        f = self.get_var(var) == self.expr_to_z3(rhs)
+                        self.constraints.append(f)
+
+        # one call into Z3 for the whole program instead of one per statement
+        self.solver.add(*self.constraints[first_new:])
 
     def get_final_versions(self):
-        """Get the final version of each variable."""
-        final_versions = {}
-        for stmt in self.ssa_code:
-            # detect SSA assignments: (var_name, '=', expr)
-            if isinstance(stmt, tuple) and len(stmt) == 3 and stmt[1] == '=':
-                var = stmt[0]
-                base_var = var.split('_')[0]
-                final_versions[base_var] = var
-        return final_versions
+        """Get the final version of each variable (available after to_smt)."""
+        return self.final_versions
 
     def check_assertions(self):
         """Check if all assertions hold."""
@@ -105,9 +187,7 @@ class SMTGenerator:
             model = self.solver.model()
             result = "✅ All assertions hold! Model:\n"
             # Sort variables by their base name and version
-            sorted_vars = sorted(self.vars.keys(), 
-                               key=lambda x: (x.split('_')[0], 
-                                           int(x.split('_')[1]) if '_' in x and x.split('_')[1].isdigit() else 0))
+            sorted_vars = sorted(self.vars.keys(), key=self._var_keys.__getitem__)
             for var in sorted_vars:
                 if self.vars[var] in model:
                     result += f"{var} = {model[self.vars[var]]}\n"
@@ -143,12 +223,72 @@ def var_from_stmt(stmt):
             return stmt[1]  # Return the variable name directly
     return None
 
+def _model_values(model, smt1, smt2):
+    """Split a counterexample model into input, program 1 and program 2 values."""
+    # one pass over the model instead of a membership scan per variable
+    model_decls = {d: model[d] for d in model.decls()}
+    input_vals, prog1_vals, prog2_vals = {}, {}, {}
+    for var_name, var_z3 in sorted(smt1.vars.items()):
+        val = model_decls.get(var_z3.decl())
+        if val is not None:
+            (input_vals if var_name.endswith('_1') else prog1_vals)[var_name] = val
+    for var_name, var_z3 in sorted(smt2.vars.items()):
+        val = model_decls.get(var_z3.decl())
+        if val is not None and not var_name.endswith('_1'):
+            prog2_vals[var_name] = val
+    return input_vals, prog1_vals, prog2_vals
+
+_EQUIVALENT = "✅ Programs are equivalent! They have the same behavior under all conditions."
+
+def _is_closed(ssa):
+    """True if the SSA assigns something and reads no unassigned (free) variables.
+
+    Free variables get a separate p1_/p2_ copy per program, so even identical
+    programs can differ on them and must go through the solver.
+    """
+    reads, assigned = set(), set()
+    stack = list(ssa)
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, (tuple, list)):
+            continue
+        if len(item) == 2 and item[0] == 'var':
+            reads.add(item[1])
+            continue
+        if len(item) == 3 and isinstance(item, tuple):
+            if item[1] == '=' and isinstance(item[0], str):
+                assigned.add(item[0])
+            elif item[0] == 'assign':
+                assigned.add(item[1])
+        stack.extend(item)
+    return bool(assigned) and reads <= assigned
+
 def check_program_equivalence(ssa1, ssa2):
     """Check if two programs in SSA form are equivalent by comparing their outputs under all conditions."""
+    if ssa1 == ssa2 and _is_closed(ssa1):
+        # identical SSA with every input assigned gets the same verdict from the
+        # full check, so skip building any constraints
+        return _EQUIVALENT
     try:
-        # Create SMT solvers with distinct variable prefixes
-        smt1 = SMTGenerator(ssa1, var_prefix="p1_")
-        smt2 = SMTGenerator(ssa2, var_prefix="p2_")
+        return _check_equivalence_cached(tuple(ssa1), tuple(ssa2))
+    except TypeError:  # unhashable statements, e.g. hand-built SSA holding lists
+        return _check_equivalence(ssa1, ssa2)
+
+@lru_cache(maxsize=128)
+def _check_equivalence_cached(ssa1, ssa2):
+    return _check_equivalence(list(ssa1), list(ssa2))
+
+def _check_equivalence(ssa1, ssa2):
+    with Z3_LOCK:
+        return _check_equivalence_locked(ssa1, ssa2)
+
+def _check_equivalence_locked(ssa1, ssa2):
+    try:
+        # One solver holds both programs' constraints; the generators use
+        # distinct variable prefixes and add directly into it
+        s = make_solver()
+        smt1 = SMTGenerator(ssa1, var_prefix="p1_", solver=s)
+        smt2 = SMTGenerator(ssa2, var_prefix="p2_", solver=s)
         
         # Convert to SMT constraints
         smt1.to_smt()
@@ -158,17 +298,8 @@ def check_program_equivalence(ssa1, ssa2):
         vars1 = smt1.get_final_versions()
         vars2 = smt2.get_final_versions()
         
-        # Create a new solver for equivalence checking
-        s = Solver()
-        
-        # Add all constraints from both programs
-        for c in smt1.solver.assertions():
-            s.add(c)
-        for c in smt2.solver.assertions():
-            s.add(c)
-        
         # Check if variables can have different values
-        common_vars = set(vars1.keys()) & set(vars2.keys())
+        common_vars = vars1.keys() & vars2.keys()
         if not common_vars:
             return "❌ Programs are NOT equivalent! No common variables to compare."
         
@@ -183,23 +314,7 @@ def check_program_equivalence(ssa1, ssa2):
                 model = s.model()
                 result = "❌ Programs are NOT equivalent!\n\n"
                 
-                # Get input values
-                input_vals = {}
-                for var_name, var_z3 in sorted(smt1.vars.items()):
-                    if var_name.endswith('_1') and var_z3.decl() in model:
-                        input_vals[var_name] = model[var_z3]
-                
-                # Get program 1 values
-                prog1_vals = {}
-                for var_name, var_z3 in sorted(smt1.vars.items()):
-                    if var_z3.decl() in model and not var_name.endswith('_1'):
-                        prog1_vals[var_name] = model[var_z3]
-                
-                # Get program 2 values
-                prog2_vals = {}
-                for var_name, var_z3 in sorted(smt2.vars.items()):
-                    if var_z3.decl() in model and not var_name.endswith('_1'):
-                        prog2_vals[var_name] = model[var_z3]
+                input_vals, prog1_vals, prog2_vals = _model_values(model, smt1, smt2)
                 
                 result += "Input values:\n"
                 result += "\n".join(f"{var} = {val}" for var, val in input_vals.items())
@@ -229,46 +344,38 @@ def check_program_equivalence(ssa1, ssa2):
         assertions1 = get_assertions(ssa1)
         assertions2 = get_assertions(ssa2)
         
-        # Check if assertions can be violated in different ways
-        for (assert1, cond1), (assert2, cond2) in zip(assertions1, assertions2):
+        # Check if assertions can be violated in different ways. All pairs go into
+        # one query; a tracking literal per pair tells which one the model hit.
+        pairs = list(zip(assertions1, assertions2))
+        if pairs:
             s.push()
-            
-            # Convert conditions to Z3 formulas
-            z3_cond1 = smt1.expr_to_z3(cond1) if cond1 else True
-            z3_cond2 = smt2.expr_to_z3(cond2) if cond2 else True
-            
-            # Convert assertions to Z3 formulas
-            z3_assert1 = smt1.expr_to_z3(assert1)
-            z3_assert2 = smt2.expr_to_z3(assert2)
-            
-            # Check if assertions can be satisfied differently
-            s.add(Or(
-                And(z3_cond1, z3_assert1, Not(z3_assert2)),
-                And(z3_cond2, Not(z3_assert1), z3_assert2)
-            ))
+            literals = []
+            for i, ((assert1, cond1), (assert2, cond2)) in enumerate(pairs):
+                # Convert conditions to Z3 formulas
+                z3_cond1 = smt1.expr_to_z3(cond1) if cond1 else BoolVal(True, ctx=_CTX)
+                z3_cond2 = smt2.expr_to_z3(cond2) if cond2 else BoolVal(True, ctx=_CTX)
+                
+                # Convert assertions to Z3 formulas
+                z3_assert1 = smt1.expr_to_z3(assert1)
+                z3_assert2 = smt2.expr_to_z3(assert2)
+                
+                # Check if assertions can be satisfied differently
+                literal = Bool(f"__assert_probe_{i}", ctx=_CTX)
+                s.add(Implies(literal, Or(
+                    And(z3_cond1, z3_assert1, Not(z3_assert2)),
+                    And(z3_cond2, Not(z3_assert1), z3_assert2)
+                )))
+                literals.append(literal)
+            s.add(Or(*literals))
             
             if s.check() == sat:
                 model = s.model()
+                fired = next(i for i, literal in enumerate(literals) if is_true(model.eval(literal)))
+                (assert1, cond1), (assert2, cond2) = pairs[fired]
                 result = "❌ Programs are NOT equivalent!\n"
                 result += "Programs have different assertion behaviors:\n\n"
                 
-                # Get input values
-                input_vals = {}
-                for var_name, var_z3 in sorted(smt1.vars.items()):
-                    if var_name.endswith('_1') and var_z3.decl() in model:
-                        input_vals[var_name] = model[var_z3]
-                
-                # Get program 1 values
-                prog1_vals = {}
-                for var_name, var_z3 in sorted(smt1.vars.items()):
-                    if var_z3.decl() in model and not var_name.endswith('_1'):
-                        prog1_vals[var_name] = model[var_z3]
-                
-                # Get program 2 values
-                prog2_vals = {}
-                for var_name, var_z3 in sorted(smt2.vars.items()):
-                    if var_z3.decl() in model and not var_name.endswith('_1'):
-                        prog2_vals[var_name] = model[var_z3]
+                input_vals, prog1_vals, prog2_vals = _model_values(model, smt1, smt2)
                 
                 result += "Input values:\n"
                 result += "\n".join(f"{var} = {val}" for var, val in input_vals.items())
@@ -287,7 +394,7 @@ def check_program_equivalence(ssa1, ssa2):
             
             s.pop()
         
-        return "✅ Programs are equivalent! They have the same behavior under all conditions."
+        return _EQUIVALENT
     
     except Exception as e:
         import traceback
@@ -305,8 +412,63 @@ def format_condition(cond):
             return f"{left} {op} {right}"
     return str(cond)
 
+def _split_top_level(text):
+    """Split text on commas that are not nested inside parentheses."""
+    parts = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(text):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return parts
+
+def _parse_operand(text):
+    """Parse one operand of an SSA expression: a tuple literal, an int or a variable name."""
+    text = text.strip()
+    if text.startswith('('):
+        return ast.literal_eval(text)
+    if text.isdigit() or (text.startswith('-') and text[1:].isdigit()):
+        return int(text)
+    return ('var', text)
+
+def _parse_arith(text):
+    """Parse an infix SSA expression; * binds tighter than + and -, all left-associative."""
+    # One scan for the operators, then iterative folding, so long chains
+    # neither recurse nor rescan the text
+    operands, ops = [], []
+    pos = 0
+    for m in _BINOP_RE.finditer(text):
+        operands.append(text[pos:m.start()])
+        ops.append(m.group(1))
+        pos = m.end()
+    operands.append(text[pos:])
+
+    terms = [_parse_operand(operands[0])]
+    term_ops = []
+    for op, operand in zip(ops, operands[1:]):
+        value = _parse_operand(operand)
+        if op == '*':
+            terms[-1] = ('mul', terms[-1], value)
+        else:
+            term_ops.append(op)
+            terms.append(value)
+    expr = terms[0]
+    for op, term in zip(term_ops, terms[1:]):
+        expr = (_OP_TAGS[op], expr, term)
+    return expr
+
 def parse_ssa(ssa_str):
     """Parse SSA string format into structured format."""
+    return list(_parse_ssa_cached(ssa_str))
+
+@lru_cache(maxsize=512)
+def _parse_ssa_cached(ssa_str):
     ssa_code = []
     current_if = None
     then_block = []
@@ -328,13 +490,17 @@ def parse_ssa(ssa_str):
                     left, right = cond.split('<')
                     left = ('var', left.strip()) if not left.strip().isdigit() else int(left)
                     right = int(right.strip())
-                    current_if = ('if', ('cond', '<', left, right), [], None)
+                    current_if = ('if', ('cond', '<', left, right))
+                    then_block = []
+            except RecursionError:
+                raise
             except:
                 continue
         elif line == '}':
             # End of block
             if current_if:
-                ssa_code.append(current_if)
+                # blocks are tuples so cached results cannot be mutated by callers
+                ssa_code.append(current_if + (tuple(then_block), else_block))
                 current_if = None
         elif ':=' in line:
             var, expr = line.split(':=')
@@ -345,59 +511,37 @@ def parse_ssa(ssa_str):
             
             try:
                 if expr.startswith('(\'var\','):
-                    expr = eval(expr)
+                    expr = ast.literal_eval(expr)
                 elif expr.startswith('(\'cond\','):
-                    expr = eval(expr)
+                    expr = ast.literal_eval(expr)
                 elif expr.startswith('phi('):
                     # Handle phi nodes
-                    phi_args = expr[4:-1].split(',')
-                    expr = ('phi', 
-                           eval(phi_args[0].strip()) if phi_args[0].strip() != 'None' else None,
-                           eval(phi_args[1].strip()) if phi_args[1].strip() != 'None' else None)
-                elif '+' in expr:
-                    parts = expr.split('+')
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    left = eval(left) if left.startswith('(') else (int(left) if left.isdigit() else ('var', left))
-                    right = eval(right) if right.startswith('(') else (int(right) if right.isdigit() else ('var', right))
-                    expr = ('add', left, right)
-                elif '-' in expr:
-                    parts = expr.split('-')
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    left = eval(left) if left.startswith('(') else (int(left) if left.isdigit() else ('var', left))
-                    right = eval(right) if right.startswith('(') else (int(right) if right.isdigit() else ('var', right))
-                    expr = ('sub', left, right)
-                elif '*' in expr:
-                    parts = expr.split('*')
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    left = eval(left) if left.startswith('(') else (int(left) if left.isdigit() else ('var', left))
-                    right = eval(right) if right.startswith('(') else (int(right) if right.isdigit() else ('var', right))
-                    expr = ('mul', left, right)
-                elif expr.isdigit() or (expr.startswith('-') and expr[1:].isdigit()):
-                    expr = int(expr)
+                    phi_args = _split_top_level(expr[4:-1])
+                    expr = ('phi',) + tuple(
+                        None if arg == 'None' else _parse_operand(arg) for arg in phi_args)
                 else:
-                    expr = ('var', expr)
+                    expr = _parse_arith(expr)
                 
                 stmt = ('assign', var, expr)  
                 if current_if:
-                    current_if[2].append(stmt)
+                    then_block.append(stmt)
                 else:
                     ssa_code.append(stmt)
+            except RecursionError:
+                raise
             except:
                 if current_if:
-                    current_if[2].append((var, '=', expr))
+                    then_block.append((var, '=', expr))
                 else:
                     ssa_code.append((var, '=', expr))
         elif line.startswith('assert'):
             try:
                 cond = line[7:-1]  # Remove assert( and )
                 if cond.startswith('(\'var\','):
-                    var = eval(cond)
+                    var = ast.literal_eval(cond)
                     ssa_code.append(('assert', ('cond', '>', var, 0)))
                 elif cond.startswith('(\'cond\','):
-                    cond = eval(cond)
+                    cond = ast.literal_eval(cond)
                     ssa_code.append(('assert', cond))
                 else:
                     # Handle other assertion formats
@@ -406,10 +550,12 @@ def parse_ssa(ssa_str):
                         left = ('var', left.strip()) if not left.strip().isdigit() else int(left)
                         right = int(right.strip())
                         ssa_code.append(('assert', ('cond', '>', left, right)))
+            except RecursionError:
+                raise
             except:
                 continue
 
-    return ssa_code
+    return tuple(ssa_code)
 
 def get_input_vars(vars_dict):
     """Get input variables (usually _1 suffix)"""
@@ -434,14 +580,22 @@ def get_output_vars(vars_dict):
     return [var_info[0] for var_info in var_groups.values()]
 
 
+@lru_cache(maxsize=512)
 def convert_ssa_to_smt(ssa_output):
     """Convert SSA output to SMT constraints and check assertions."""
     if not ssa_output:
         return "No SSA code provided"
         
-    ssa_code = parse_ssa(ssa_output)
-    
-    # Generate and check SMT constraints
+    try:
+        ssa_code = parse_ssa(ssa_output)
+
+        # Generate and check SMT constraints
+        with Z3_LOCK:
+            return _check_ssa_locked(ssa_code)
+    except RecursionError:
+        return "⚠️ Error converting SSA to SMT: expression is nested too deeply."
+
+def _check_ssa_locked(ssa_code):
     smt = SMTGenerator(ssa_code)
     smt.to_smt()
     return smt.check_assertions()
@@ -3,16 +3,27 @@ Static Single Assignment (SSA) form converter implementation.
 This module provides functionality to convert code into SSA form.
 """
 
+from ast_nodes import Assign, If, Assert, Cond, Var, Add, Sub, Mul, Div, BINOPS, as_node
+
+_OPS = {Add: '+', Sub: '-', Mul: '*', Div: '/'}
+
 class SSAConverter:
     def __init__(self):
         self.counter = {}  # Tracks variable versions: {'x': 3}
         self.env = {}      # Current version mapping: {'x': 'x_3'}
         self.ssa = []      # List of SSA statements
 
+    def reset(self):
+        """Clear all version state so the converter can be reused."""
+        self.counter.clear()
+        self.env.clear()
+        self.ssa = []  # fresh list: the previous result may still be in use
+
     def new_version(self, var):
         """Create a new version of a variable."""
-        n = self.counter.get(var, 0) + 1
-        self.counter[var] = n
+        counter = self.counter
+        n = counter.get(var, 0) + 1
+        counter[var] = n
         vname = f"{var}_{n}"
         self.env[var] = vname
         return vname
@@ -23,84 +34,99 @@ class SSAConverter:
 
     def convert(self, ast):
         """Convert AST to SSA form."""
-        for stmt in ast:
-            if stmt[0] == 'assign':
-                self.handle_assignment(stmt)
-            elif stmt[0] == 'if':
-                self.handle_if(stmt)
-            elif stmt[0] == 'assert':
-                self.handle_assert(stmt)
+        # bound once here: reset() replaces self.ssa, so it can't be cached on the instance
+        append = self.ssa.append
+        # plain tagged tuples would not match the type checks below
+        for stmt in as_node(ast):
+            kind = type(stmt)
+            if kind is Assign:
+                self.handle_assignment(stmt, append)
+            elif kind is If:
+                self.handle_if(stmt, append)
+            elif kind is Assert:
+                self.handle_assert(stmt, append)
         return self.ssa
 
-    def handle_assignment(self, stmt):
+    def handle_assignment(self, stmt, append=None):
         """Handle assignment statement."""
+        if append is None:
+            append = self.ssa.append
         _, var, expr = stmt
         new_var = self.new_version(var)
         new_expr = self.transform_expr(expr)
-        self.ssa.append((new_var, '=', new_expr))
+        append((new_var, '=', new_expr))
 
-    def handle_if(self, stmt):
+    def handle_if(self, stmt, append=None):
         """Handle if statement."""
+        if append is None:
+            append = self.ssa.append
         _, cond, true_block, false_block = stmt
         new_cond = self.transform_expr(cond)
-        self.ssa.append(('if', new_cond))
+        append(('if', new_cond))
         
         if true_block:
             for s in true_block:
-                if s[0] == 'assign':
-                    self.handle_assignment(s)
+                if type(s) is Assign:
+                    self.handle_assignment(s, append)
         
         if false_block:
             for s in false_block:
-                if s[0] == 'assign':
-                    self.handle_assignment(s)
+                if type(s) is Assign:
+                    self.handle_assignment(s, append)
 
-    def handle_assert(self, stmt):
+    def handle_assert(self, stmt, append=None):
         """Handle assert statement."""
+        if append is None:
+            append = self.ssa.append
         _, cond = stmt
         new_cond = self.transform_expr(cond)
-        self.ssa.append(('assert', new_cond))
+        append(('assert', new_cond))
 
     def transform_expr(self, expr):
         """Transform expression to use SSA variables."""
-        if isinstance(expr, tuple):
-            if expr[0] == 'var':
-                return ('var', self.current(expr[1]))
-            elif expr[0] == 'cond':
-                op = expr[1].value if hasattr(expr[1], 'value') else expr[1]
-                left = self.transform_expr(expr[2])
-                right = self.transform_expr(expr[3])
-                return ('cond', op, left, right)
-            elif expr[0] in ('add', 'sub', 'mul', 'div'):
-                left = self.transform_expr(expr[1])
-                right = self.transform_expr(expr[2])
-                return (expr[0], left, right)
+        kind = type(expr)
+        if kind is Var:
+            return Var(self.current(expr.name))
+        elif kind is Cond:
+            op = expr.op.value if hasattr(expr.op, 'value') else expr.op
+            left = self.transform_expr(expr.left)
+            right = self.transform_expr(expr.right)
+            if left is expr.left and right is expr.right and op is expr.op:
+                return expr
+            return Cond(op, left, right)
+        elif kind in BINOPS:
+            left = self.transform_expr(expr.left)
+            right = self.transform_expr(expr.right)
+            if left is expr.left and right is expr.right:
+                return expr  # no variables below, the node can be shared
+            return kind(left, right)
         return expr
 
-def format_ssa_output(ssa_list):
-    """Format SSA statements into readable code."""
-    def format_expr(expr):
-        if isinstance(expr, tuple):
-            if expr[0] == 'var':
-                return expr[1]
-            elif expr[0] == 'cond':
-                return f"{format_expr(expr[2])} {expr[1]} {format_expr(expr[3])}"
-            elif expr[0] in ('add', 'sub', 'mul', 'div'):
-                ops = {
-                    'add': '+', 'sub': '-',
-                    'mul': '*', 'div': '/'
-                }
-                return f"{format_expr(expr[1])} {ops[expr[0]]} {format_expr(expr[2])}"
+def _format_expr(expr):
+    # Plain tagged tuples, e.g. ('add', ('var', 'a'), 1), format like their nodes
+    expr = as_node(expr)
+    kind = type(expr)
+    if kind is int:
         return str(expr)
+    elif kind is Var:
+        return expr.name
+    elif kind is Cond:
+        return f"{_format_expr(expr.left)} {expr.op} {_format_expr(expr.right)}"
+    op = _OPS.get(kind)
+    if op is not None:
+        return f"{_format_expr(expr.left)} {op} {_format_expr(expr.right)}"
+    return str(expr)
 
+def format_ssa_output(ssa_list):
+    """Format SSA statements into readable code."""
     output = []
     for stmt in ssa_list:
         if isinstance(stmt, tuple):
             if stmt[0] == 'if':
-                output.append(f"if {format_expr(stmt[1])}")
+                output.append(f"if {_format_expr(stmt[1])}")
             elif stmt[0] == 'assert':
-                output.append(f"assert({format_expr(stmt[1])})")
+                output.append(f"assert({_format_expr(stmt[1])})")
             else:
                 var, op, rhs = stmt
-                output.append(f"{var} := {format_expr(rhs)}")
+                output.append(f"{var} := {_format_expr(rhs)}")
     return "\n".join(output)